@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+import shelve
+import threading
+from dotenv import load_dotenv
+from src.utils import ensure_output_directory
+
+# Read .env before the settings below, whichever module happens to import this first
+load_dotenv()
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("output", ".llm_cache"))
+
+# Set LLM_CACHE_DISABLED=1 to always call the model and never read or write the cache
+ENABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+# shelve does not support concurrent access, and LLM calls run in worker threads
+_lock = threading.Lock()
+
+def _open():
+    ensure_output_directory(os.path.dirname(CACHE_PATH) or ".")
+    return shelve.open(CACHE_PATH)
+
+def make_key(namespace: str, article: dict, *extra) -> str:
+    """
+    Build a cache key from the article URL and content.
+
+    Args:
+        namespace: Name of the cached operation
+        article: Article dictionary
+        *extra: Additional JSON-serializable call arguments
+
+    Returns:
+        Hex digest identifying the call
+    """
+    digest = hashlib.sha256(namespace.encode("utf-8"))
+    digest.update((article.get("url") or "").encode("utf-8"))
+    digest.update((article.get("content") or "").encode("utf-8"))
+    for part in extra:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+def get_many(keys: list) -> list:
+    """Return the cached result (or None) for each key, opening the cache once."""
+    if not ENABLED:
+        return [None] * len(keys)
+    with _lock, _open() as db:
+        return [db.get(key) for key in keys]
+
+def store_many(items: dict) -> None:
+    """Persist every key/value pair in items, opening the cache once."""
+    if not ENABLED or not items:
+        return
+    with _lock, _open() as db:
+        db.update(items)
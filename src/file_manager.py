@@ -1,123 +1,126 @@
-import json
 import os
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+from src.utils import ensure_output_directory, parse_analysis, write_json
 
 class FileManagerError(Exception):
     pass
 
-def save_raw_articles(articles: List[Dict], output_dir: str = "output") -> str:
+def _parsed(result: Dict) -> Dict:
+    """Return the parsed analysis fields, parsing only if main.py has not already."""
+    return result.get("parsed") or parse_analysis(result.get("analysis") or "")
+
+def save_raw_articles(articles: List[Dict], output_dir: str = "output", pretty: bool = False,
+                      now: Optional[datetime] = None) -> str:
     """
     Save raw fetched articles to JSON.
     
     Args:
         articles: List of raw article dictionaries
         output_dir: Directory to save the file
+        pretty: Indent the JSON output (compact by default)
+        now: Time to record in the output (defaults to the current time)
     
     Returns:
         Path to saved file
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
+        now = now or datetime.now()
+        ensure_output_directory(output_dir)
         filepath = os.path.join(output_dir, "raw_articles.json")
         
         output = {
             "metadata": {
-                "fetched_at": datetime.now().isoformat(),
+                "fetched_at": now.isoformat(),
                 "total_articles": len(articles),
                 "source": "NewsAPI"
             },
             "articles": articles
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_json(filepath, output, pretty=pretty)
         
         return filepath
         
     except Exception as e:
         raise FileManagerError(f"Failed to save raw articles: {str(e)}")
 
-def save_analysis_results(results: List[Dict], output_dir: str = "output") -> str:
+def save_analysis_results(results: List[Dict], output_dir: str = "output", pretty: bool = False,
+                          now: Optional[datetime] = None) -> str:
     """
     Save LLM analysis results to JSON.
     
     Args:
         results: List of analysis results from LLM#1
         output_dir: Directory to save the file
+        pretty: Indent the JSON output (compact by default)
+        now: Time to record in the output (defaults to the current time)
     
     Returns:
         Path to saved file
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
+        now = now or datetime.now()
+        ensure_output_directory(output_dir)
         filepath = os.path.join(output_dir, "analysis_results.json")
         
         # Count sentiments
-        sentiments = {}
-        for r in results:
-            if r.get("status") == "validated":
-                analysis = r.get("analysis", "")
-                # Try to extract sentiment from analysis
-                if "SENTIMENT:" in analysis:
-                    sentiment_line = [line for line in analysis.split('\n') if 'SENTIMENT:' in line]
-                    if sentiment_line:
-                        sentiment = sentiment_line[0].replace('SENTIMENT:', '').strip()
-                        sentiments[sentiment] = sentiments.get(sentiment, 0) + 1
+        sentiments = Counter(
+            _parsed(r)["sentiment"] for r in results if r.get("status") == "validated"
+        )
+        sentiments.pop("", None)
         
         output = {
             "metadata": {
-                "analyzed_at": datetime.now().isoformat(),
+                "analyzed_at": now.isoformat(),
                 "total_articles": len(results),
-                "sentiment_breakdown": sentiments
+                "sentiment_breakdown": dict(sentiments)
             },
             "results": results
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_json(filepath, output, pretty=pretty)
         
         return filepath
         
     except Exception as e:
         raise FileManagerError(f"Failed to save analysis results: {str(e)}")
 
-def save_final_report(results: List[Dict], output_dir: str = "output") -> str:
+def save_final_report(results: List[Dict], output_dir: str = "output", now: Optional[datetime] = None) -> str:
     """
     Save final markdown report with validation results.
     
     Args:
         results: List of validated results
         output_dir: Directory to save the file
+        now: Time to record in the output (defaults to the current time)
     
     Returns:
         Path to saved file
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
+        now = now or datetime.now()
+        ensure_output_directory(output_dir)
         filepath = os.path.join(output_dir, "final_report.md")
         
         # Calculate statistics
         total = len(results)
         validated = sum(1 for r in results if r.get("status") == "validated")
         
-        # Count sentiments from analyses
-        sentiment_counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
+        # Count sentiments from analyses, keyed on the first word ("Positive", ...);
+        # whitespace-only sentiments have no first word and are skipped
+        sentiment_counts = Counter(
+            words[0].strip(".,*").title()
+            for words in (_parsed(r)["sentiment"].split() for r in results if r.get("status") == "validated")
+            if words
+        )
         
-        for r in results:
-            if r.get("status") == "validated":
-                analysis = r.get("analysis", "")
-                if "Positive" in analysis:
-                    sentiment_counts["Positive"] += 1
-                elif "Negative" in analysis:
-                    sentiment_counts["Negative"] += 1
-                elif "Neutral" in analysis:
-                    sentiment_counts["Neutral"] += 1
-        
-        # Build markdown content
-        md_content = f"""# News Analysis Report
+        # Write the report section by section instead of building it in memory
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(f"""# News Analysis Report
 
-**Date:** {datetime.now().strftime("%Y-%m-%d")}
+**Date:** {now.strftime("%Y-%m-%d")}
 **Articles Analyzed:** {validated}
 **Source:** NewsAPI
 
@@ -133,69 +136,53 @@ def save_final_report(results: List[Dict], output_dir: str = "output") -> str:
 
 ## Detailed Analysis
 
-"""
-        
-        article_num = 1
-        for result in results:
-            if result.get("status") != "validated":
-                continue
-                
-            article = result.get("article", {})
-            analysis = result.get("analysis", "")
-            validation = result.get("validation", {})
-            
-            # Parse analysis into components
-            gist = ""
-            sentiment = ""
-            tone = ""
-            
-            # More flexible parsing
-            lines = analysis.split('\n')
-            for i, line in enumerate(lines):
-                line_upper = line.upper()
-                if 'GIST' in line_upper and ':' in line:
-                    gist = line.split(':', 1)[1].strip() if ':' in line else ""
-                    # Check if gist continues on next line
-                    if not gist and i + 1 < len(lines):
-                        gist = lines[i + 1].strip()
-                elif 'SENTIMENT' in line_upper and ':' in line:
-                    sentiment = line.split(':', 1)[1].strip() if ':' in line else ""
-                    if not sentiment and i + 1 < len(lines):
-                        sentiment = lines[i + 1].strip()
-                elif 'TONE' in line_upper and ':' in line:
-                    tone = line.split(':', 1)[1].strip() if ':' in line else ""
-                    if not tone and i + 1 < len(lines):
-                        tone = lines[i + 1].strip()
-            
-            # Fallback: if still empty, use the full analysis
-            if not gist and not sentiment and not tone:
-                gist = analysis[:200] + "..." if len(analysis) > 200 else analysis
+""")
             
-            # Validation verdict emoji
-            verdict = validation.get("verdict", "unknown")
-            verdict_symbol = {
-                "correct": "✓",
-                "partially_correct": "~",
-                "incorrect": "✗"
-            }.get(verdict, "?")
-            
-            validation_text = validation.get("overall_assessment", "No validation details")
-            
-            md_content += f"""### Article {article_num}: "{article.get('title', 'Untitled')}"
+            article_num = 1
+            for result in results:
+                if result.get("status") != "validated":
+                    continue
+                
+                article = result.get("article", {})
+                analysis = result.get("analysis", "")
+                validation = result.get("validation", {})
+                
+                # Parse analysis into components
+                parsed = _parsed(result)
+                gist = parsed["gist"]
+                sentiment = parsed["sentiment"]
+                tone = parsed["tone"]
+                
+                # Fallback: if still empty, use the full analysis
+                if not gist and not sentiment and not tone:
+                    gist = analysis[:200] + "..." if len(analysis) > 200 else analysis
+                
+                # Validation verdict emoji
+                verdict = validation.get("verdict", "unknown")
+                verdict_symbol = {
+                    "correct": "✓",
+                    "partially_correct": "~",
+                    "incorrect": "✗"
+                }.get(verdict, "?")
+                
+                validation_text = validation.get("overall_assessment", "No validation details")
+                verdict_text = verdict.replace('_', ' ').title()
+                title = article.get('title', 'Untitled')
+                source = article.get('source', 'Unknown')
+                url = article.get('url', '#')
+                
+                f.write(f"""### Article {article_num}: "{title}"
 
-- **Source:** [{article.get('source', 'Unknown')}]({article.get('url', '#')})
+- **Source:** [{source}]({url})
 - **Gist:** {gist}
 - **LLM#1 Sentiment:** {sentiment}
-- **LLM#2 Validation:** {verdict_symbol} {verdict.replace('_', ' ').title()}. {validation_text}
+- **LLM#2 Validation:** {verdict_symbol} {verdict_text}. {validation_text}
 - **Tone:** {tone}
 
 ---
 
-"""
-            article_num += 1
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+""")
+                article_num += 1
         
         return filepath
         
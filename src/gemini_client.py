@@ -0,0 +1,24 @@
+from dotenv import load_dotenv
+import os
+import threading
+
+load_dotenv()
+MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+
+# google.genai pulls in a large dependency tree, so it is imported on first use
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the shared Gemini client, creating it on first call."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google import genai
+            _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
+
+def generation_config(**kwargs):
+    """Build a GenerateContentConfig without importing google.genai at module load."""
+    from google.genai import types
+    return types.GenerateContentConfig(**kwargs)
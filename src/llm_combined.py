@@ -0,0 +1,179 @@
+from src import cache
+from src.gemini_client import MODEL, get_client, generation_config
+from src.utils import loads_json, strip_code_fences, RateLimiter
+from typing import Optional
+import json
+
+# Output tokens budgeted per article; batch requests scale this by batch size
+_TOKENS_PER_ARTICLE = 1500
+
+_TASKS = """
+ANALYSIS TASK:
+1. Gist: A concise 1-2 sentence summary of the main news
+2. Sentiment: Classify as Positive, Negative, or Neutral
+3. Tone: Identify the tone (choose one: urgent, analytical, satirical, balanced, alarming, optimistic, critical, neutral)
+4. Key Entities: List important people, organizations, or locations mentioned
+5. Why This Matters: Brief explanation of significance
+
+VALIDATION TASK:
+1. Check if the summary accurately reflects the article content
+2. Verify the sentiment classification is appropriate
+3. Confirm key entities are correctly identified
+4. Assess if "why this matters" is reasonable and insightful
+"""
+
+# Each result echoes its article number so it can be matched back by index
+_RESULT_FORMAT = """{{
+  "index": 1,
+  "analysis": {{
+    "gist": "summary",
+    "sentiment": "Positive|Negative|Neutral",
+    "tone": "tone",
+    "key_entities": ["list of entities"],
+    "why_this_matters": "significance"
+  }},
+  "validation": {{
+    "verdict": "correct|partially_correct|incorrect",
+    "confidence": 0.0-1.0,
+    "issues": ["list of specific issues found, or empty array if none"],
+    "strengths": ["list of what the analysis did well"],
+    "overall_assessment": "brief overall evaluation"
+  }}
+}}"""
+
+_BATCH_TMPL = """
+You are a news intelligence analyst. For each of the following {count} news articles, analyze
+the article, then critically validate your own analysis against the article text.
+
+{articles}""" + _TASKS + """
+Respond ONLY with a JSON array of exactly {count} objects, one per article. Each object must
+set "index" to the number of the article it describes, in this exact format:
+""" + _RESULT_FORMAT + """
+
+Do not include any text before or after the JSON array.
+"""
+
+_BATCH_ARTICLE_TMPL = """Article {index}:
+Title: {title}
+Description: {description}
+Content: {content}
+"""
+
+class LLMCombinedError(Exception):
+    pass
+
+def _format_analysis(analysis: dict) -> str:
+    """Render the structured analysis with the same headings LLM#1 produces."""
+    entities = analysis.get("key_entities", [])
+    if isinstance(entities, list):
+        entities = ", ".join(str(e) for e in entities)
+
+    return (
+        f"GIST: {analysis.get('gist', '')}\n\n"
+        f"SENTIMENT: {analysis.get('sentiment', '')}\n\n"
+        f"TONE: {analysis.get('tone', '')}\n\n"
+        f"KEY ENTITIES: {entities}\n\n"
+        f"WHY THIS MATTERS: {analysis.get('why_this_matters', '')}"
+    )
+
+def _to_result(article: dict, combined: dict) -> dict:
+    """Build an article's result from one parsed JSON object."""
+    validation_result = combined["validation"]
+    validation_result["article_title"] = article.get("title")
+    validation_result["validated_at"] = None  # Will be added by main.py
+
+    return {
+        "title": article.get("title"),
+        "analysis": _format_analysis(combined["analysis"]),
+        "validation": validation_result,
+    }
+
+def _generate_json(prompt: str, max_output_tokens: int):
+    """Send prompt to Gemini and parse the JSON response."""
+    try:
+        response = get_client().models.generate_content(
+            model=MODEL,
+            contents=prompt,
+            config=generation_config(
+                temperature=0.2,
+                max_output_tokens=max_output_tokens,
+            ),
+        )
+
+        # Extract and parse JSON from response, removing markdown code blocks if present
+        response_text = strip_code_fences(response.text)
+
+        return loads_json(response_text)
+
+    except json.JSONDecodeError as e:
+        raise LLMCombinedError(f"Failed to parse combined response as JSON: {e}\nResponse: {response.text}")
+    except Exception as e:
+        raise LLMCombinedError(f"Analysis failed: {str(e)}")
+
+def _cache_key(article: dict) -> str:
+    """Cache key for an article's result; a new model or prompt invalidates old entries."""
+    return cache.make_key("analyze_and_validate", article, MODEL, _BATCH_TMPL, _BATCH_ARTICLE_TMPL)
+
+def analyze_and_validate_batch(articles: list, limiter: Optional[RateLimiter] = None) -> list:
+    """
+    Analyzes and validates several articles with one LLM call.
+
+    Articles already in the cache are served from it; only the rest are
+    sent to the model.
+
+    Args:
+        articles: List of article dicts with title, description, content
+        limiter: Rate limiter to acquire before calling the model; fully
+            cached batches never wait on it
+
+    Returns:
+        List of dicts with title, analysis text and validation result, in the
+        same order as articles
+    """
+    keys = [_cache_key(article) for article in articles]
+    results = cache.get_many(keys)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    if limiter is not None:
+        limiter.acquire()
+
+    blocks = [
+        _BATCH_ARTICLE_TMPL.format(
+            index=n,
+            title=articles[i].get("title"),
+            description=articles[i].get("description", "N/A"),
+            content=articles[i].get("content"),
+        )
+        for n, i in enumerate(missing, 1)
+    ]
+    prompt = _BATCH_TMPL.format(count=len(missing), articles="\n".join(blocks))
+    combined = _generate_json(prompt, _TOKENS_PER_ARTICLE * len(missing))
+
+    if not isinstance(combined, list) or len(combined) != len(missing):
+        raise LLMCombinedError(f"Expected a JSON array of {len(missing)} results")
+
+    # Match results to articles by the echoed index rather than trusting the array order
+    by_index = {}
+    try:
+        for item in combined:
+            index = int(item["index"])
+            if index in by_index:
+                raise LLMCombinedError(f"Duplicate result for article {index}")
+            by_index[index] = item
+    except (KeyError, TypeError, ValueError) as e:
+        raise LLMCombinedError(f"Batch result missing a valid index: {e}")
+
+    if by_index.keys() != set(range(1, len(missing) + 1)):
+        raise LLMCombinedError(f"Batch result indices {sorted(by_index)} do not match articles 1-{len(missing)}")
+
+    try:
+        for n, i in enumerate(missing, 1):
+            results[i] = _to_result(articles[i], by_index[n])
+    except (KeyError, TypeError) as e:
+        raise LLMCombinedError(f"Combined response missing section: {e}")
+
+    cache.store_many({keys[i]: results[i] for i in missing})
+
+    return results
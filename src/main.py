@@ -1,24 +1,36 @@
 #!/usr/bin/env python3
 """
 News Analyzer - Main Pipeline
-Fetches news → Analyzes with LLM#1 → Validates with LLM#2 → Saves reports
+Fetches news → Analyzes and validates with Gemini (batched calls) → Saves reports
 """
 
 from src.news_fetcher import fetch_news, NewsFetcherError
-from src.llm_analyzer import analyze_article, LLMAnalysisError
-from src.llm_validator import validate_analysis, LLMValidationError
+from src.llm_combined import analyze_and_validate_batch, LLMCombinedError
 from src.file_manager import save_raw_articles, save_analysis_results, save_final_report, FileManagerError
-from src.utils import get_timestamp, print_progress, validate_article
+from src.utils import ensure_output_directory, get_timestamp, print_progress, validate_articles, parse_analysis, RateLimiter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import argparse
+import os
 import sys
-import time
+
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="News Analyzer pipeline")
+    parser.add_argument("--debug", action="store_true", help="pretty-print JSON output files")
+    return parser.parse_args()
 
 def main():
     """Main pipeline execution."""
+    args = parse_args()
+    
     print("=" * 70)
     print("NEWS ANALYZER - Dual LLM Analysis & Validation Pipeline")
     print("=" * 70)
     print()
     
+    ensure_output_directory()
+    
     results = []
     articles = []
     
@@ -32,98 +44,98 @@ def main():
             print("⚠️  No articles found. Exiting.")
             return
         
-        # Save raw articles
-        try:
-            raw_path = save_raw_articles(articles)
-            print(f"💾 Raw articles saved: {raw_path}\n")
-        except FileManagerError as e:
-            print(f"⚠️  Warning: Could not save raw articles: {str(e)}\n")
-        
-        # Step 2: Analyze with LLM#1 (Gemini)
-        print("🤖 Step 2: Analyzing articles with LLM#1 (Gemini)...")
+        # Step 2: Analyze and validate with Gemini (batched calls)
+        print("🤖 Step 2: Analyzing and validating articles with Gemini...")
         print()
         
-        for idx, article in enumerate(articles, 1):
-            print_progress(idx - 1, len(articles), f"Analyzing {idx}/{len(articles)}")
-            
-            # Validate article has required fields
-            if not validate_article(article):
-                print(f"\n⚠️  Skipping article {idx}: Missing required fields")
-                continue
-            
-            result = {
+        # Drop articles missing required fields before any work is scheduled
+        valid_articles = [article for article, ok in zip(articles, validate_articles(articles)) if ok]
+        skipped = len(articles) - len(valid_articles)
+        if skipped:
+            print(f"⚠️  Skipping {skipped} articles: Missing required fields\n")
+        
+        analysis_ts = get_timestamp()
+        results = [
+            {
                 "article": article,
                 "analysis": None,
                 "validation": None,
-                "timestamp": get_timestamp(),
+                "timestamp": analysis_ts,
                 "status": "pending"
             }
-            
+            for article in valid_articles
+        ]
+        
+        # Several articles share one request; batches run concurrently and the
+        # limiter keeps us within the Gemini quota
+        rpm = max(1, int(os.getenv("GEMINI_RPM", 5)))
+        batch_size = max(1, int(os.getenv("GEMINI_BATCH_SIZE", 5)))
+        limiter = RateLimiter(rpm)
+        batches = [results[i:i + batch_size] for i in range(0, len(results), batch_size)]
+        
+        # One extra worker writes the raw articles while the first batches are in flight
+        with ThreadPoolExecutor(max_workers=rpm + 1) as executor:
+            raw_future = executor.submit(save_raw_articles, articles, pretty=args.debug)
+            futures = {
+                executor.submit(analyze_and_validate_batch, [r["article"] for r in batch], limiter): (start, batch)
+                for start, batch in zip(range(1, len(results) + 1, batch_size), batches)
+            }
             try:
-                # Analyze with LLM#1
-                analysis = analyze_article(article)
-                result["analysis"] = analysis.get("analysis")
-                result["status"] = "analyzed"
-                
-                # Add delay to avoid rate limits (5 req/min = 12 sec between requests)
-                time.sleep(13)
-                
-            except LLMAnalysisError as e:
-                print(f"\n❌ Analysis failed for article {idx}: {str(e)}")
-                result["status"] = "analysis_failed"
-                result["error"] = str(e)
-            
-            results.append(result)
-        
-        print_progress(len(articles), len(articles), "Analysis complete!")
+                for done, future in enumerate(as_completed(futures), 1):
+                    print_progress(done - 1, len(futures), f"Analyzing batch {done}/{len(futures)}")
+                    start, batch = futures[future]
+                    
+                    try:
+                        combined_results = future.result()
+                    
+                    except LLMCombinedError as e:
+                        print(f"\n❌ Analysis failed for articles {start}-{start + len(batch) - 1}: {str(e)}")
+                        for result in batch:
+                            result["status"] = "analysis_failed"
+                            result["error"] = str(e)
+                        continue
+                    
+                    for result, combined in zip(batch, combined_results):
+                        validation = combined["validation"]
+                        validation["validated_at"] = analysis_ts
+                        result["analysis"] = combined["analysis"]
+                        result["parsed"] = parse_analysis(combined["analysis"])
+                        result["validation"] = validation
+                        result["status"] = "validated"
+            except KeyboardInterrupt:
+                # Leaving the with block would otherwise wait for every queued batch;
+                # closing the limiter also stops workers waiting for a request slot
+                limiter.close()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        
+        print_progress(len(batches), len(batches), "Analysis complete!")
         print()
         
-        # Step 3: Validate with LLM#2 (Gemini with different prompt)
-        print("\n🔍 Step 3: Validating analyses with LLM#2 (Gemini Validator)...")
-        print()
-        
-        validated_count = 0
-        for idx, result in enumerate(results, 1):
-            if result["status"] != "analyzed":
-                continue
-                
-            print_progress(idx - 1, len(results), f"Validating {idx}/{len(results)}")
-            
-            try:
-                validation = validate_analysis(result["article"], {"analysis": result["analysis"]})
-                validation["validated_at"] = get_timestamp()
-                result["validation"] = validation
-                result["status"] = "validated"
-                validated_count += 1
-                
-                # Add delay to avoid rate limits
-                time.sleep(13)
-                
-            except LLMValidationError as e:
-                print(f"\n⚠️  Validation failed for article {idx}: {str(e)}")
-                result["status"] = "validation_failed"
-                result["error"] = str(e)
-        
-        print_progress(len(results), len(results), "Validation complete!")
-        print()
+        try:
+            raw_path = raw_future.result()
+            print(f"💾 Raw articles saved: {raw_path}\n")
+        except FileManagerError as e:
+            print(f"⚠️  Warning: Could not save raw articles: {str(e)}\n")
         
-        # Step 4: Save Results
-        print("\n💾 Step 4: Saving results...")
+        # Step 3: Save Results
+        print("\n💾 Step 3: Saving results...")
         
+        saved_at = datetime.now()
         try:
             # Save analysis results (JSON)
-            analysis_path = save_analysis_results(results)
+            analysis_path = save_analysis_results(results, pretty=args.debug, now=saved_at)
             print(f"✅ Analysis results saved: {analysis_path}")
             
             # Save final report (Markdown)
-            report_path = save_final_report(results)
+            report_path = save_final_report(results, now=saved_at)
             print(f"✅ Final report saved: {report_path}")
             
         except FileManagerError as e:
             print(f"❌ Failed to save results: {str(e)}")
             return
         
-        # Step 5: Summary
+        # Step 4: Summary
         print("\n" + "=" * 70)
         print("PIPELINE SUMMARY")
         print("=" * 70)
@@ -137,8 +149,8 @@ def main():
         incorrect = sum(1 for r in results if r.get("validation") and r["validation"].get("verdict") == "incorrect")
         
         print(f"📊 Total Articles Fetched: {len(articles)}")
-        print(f"✅ Successfully Analyzed (LLM#1): {analyzed}")
-        print(f"✅ Successfully Validated (LLM#2): {validated}")
+        print(f"✅ Successfully Analyzed: {analyzed}")
+        print(f"✅ Successfully Validated: {validated}")
         print()
         print("Validation Results:")
         print(f"  ✓ Correct: {correct}")
@@ -6,7 +6,7 @@ This simulates what the pipeline would produce with a working API quota
 
 from src.news_fetcher import fetch_news
 from src.file_manager import save_raw_articles, save_analysis_results, save_final_report
-from src.utils import get_timestamp
+from src.utils import get_timestamp, parse_analysis
 import json
 
 # Mock LLM responses (realistic examples based on news topics)
@@ -108,6 +108,7 @@ def generate_mock_demo():
         result = {
             "article": article,
             "analysis": MOCK_ANALYSES[i]["analysis"],
+            "parsed": parse_analysis(MOCK_ANALYSES[i]["analysis"]),
             "validation": MOCK_VALIDATIONS[i],
             "timestamp": get_timestamp(),
             "status": "validated"
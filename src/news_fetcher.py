@@ -1,14 +1,27 @@
+import hashlib
 import os
-import uuid
 import requests
+import urllib3
 from typing import List, Dict
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 load_dotenv()
 
 
+# With stream=True the body is read after session.get returns, so connection
+# and parse failures surface while iterating over the articles
+_READ_ERRORS = (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, ValueError)
+if ijson is not None:
+    _READ_ERRORS += (ijson.JSONError,)
+
+
 class NewsFetcherError(Exception):
     """Custom exception for news fetching failures."""
     pass
@@ -24,12 +37,16 @@ def _get_session() -> requests.Session:
         status_forcelist=[429, 500, 502, 503, 504],
         allowed_methods=["GET"],
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=4, pool_maxsize=10)
     session = requests.Session()
     session.mount("https://", adapter)
     return session
 
 
+# Shared across calls so the connection pool (and TLS sessions) are reused
+_SESSION = _get_session()
+
+
 def fetch_news() -> List[Dict]:
     """
     Fetch recent Indian political news articles from NewsAPI.
@@ -57,40 +74,47 @@ def fetch_news() -> List[Dict]:
         "apiKey": api_key,
     }
 
-    session = _get_session()
-
     try:
-        response = session.get(url, params=params, timeout=timeout)
+        response = _SESSION.get(url, params=params, timeout=timeout, stream=ijson is not None)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         raise NewsFetcherError(f"Failed to fetch news: {e}")
 
-    data = response.json()
-    raw_articles = data.get("articles", [])
-
     normalized_articles = []
 
-    for article in raw_articles:
-        title = article.get("title")
-        content = article.get("content") or article.get("description")
-        source = article.get("source", {}).get("name")
-        url = article.get("url")
-        published_at = article.get("publishedAt")
-
-        # Filter unusable articles
-        if not title or not content or len(content) < 50:
-            continue
-
-        normalized_articles.append(
-            {
-                "id": str(uuid.uuid4()),
-                "title": title.strip(),
-                "content": content.strip(),
-                "source": source or "Unknown",
-                "url": url,
-                "published_at": published_at,
-            }
-        )
+    try:
+        with response:
+            if ijson is not None:
+                # Parse articles one at a time so rejected ones are dropped as they arrive
+                response.raw.decode_content = True
+                raw_articles = ijson.items(response.raw, "articles.item", use_float=True)
+            else:
+                raw_articles = response.json().get("articles", [])
+
+            for article in raw_articles:
+                title = article.get("title")
+                content = article.get("content") or article.get("description")
+                source = article.get("source", {}).get("name")
+                url = article.get("url")
+                published_at = article.get("publishedAt")
+
+                # Filter unusable articles
+                if not title or not content or len(content) < 50:
+                    continue
+
+                normalized_articles.append(
+                    {
+                        # Stable across runs so the same article can be deduplicated/cached
+                        "id": hashlib.blake2b((url or title).encode("utf-8"), digest_size=8).hexdigest(),
+                        "title": title.strip(),
+                        "content": content.strip(),
+                        "source": source or "Unknown",
+                        "url": url,
+                        "published_at": published_at,
+                    }
+                )
+    except _READ_ERRORS as e:
+        raise NewsFetcherError(f"Failed to read news response: {e}")
 
     if not normalized_articles:
         raise NewsFetcherError("No valid articles found after normalization.")
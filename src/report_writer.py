@@ -1,43 +1,99 @@
-import json
+import gzip
 import os
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict
+from src.utils import dumps_json, ensure_output_directory, write_json
+
+# Timestamp embedded in report filenames
+_FILENAME_TS_FORMAT = "%Y%m%d_%H%M%S"
+
+# Markdown is flushed to disk whenever this many encoded bytes are pending
+_FLUSH_BYTES = 1 << 20
+
+_VERDICT_EMOJI = {
+    "correct": "✅",
+    "partially_correct": "⚠️",
+    "incorrect": "❌"
+}
+
+# Per-article section of the markdown report, filled with format_map
+_ARTICLE_TMPL = """### {i}. {title}
+
+**Validation:** {emoji} {verdict_upper} (Confidence: {confidence:.2f})
+
+**Source:** [{source_name}]({url})
+
+**Published:** {published}
+
+#### Analysis
+{analysis}
+
+#### Validation Results
+
+"""
 
 class ReportWriterError(Exception):
     pass
 
-def save_json_report(results: List[Dict], output_dir: str = "output") -> str:
+def _tally(results: List[Dict]) -> Counter:
+    """Count validation verdicts across results in a single pass."""
+    # Feeding Counter an iterable keeps the counting loop in C (_count_elements)
+    return Counter((r.get("validation") or {}).get("verdict") for r in results)
+
+def _summarize(results: List[Dict]) -> Dict:
+    """Return total, correct, partial and incorrect counts for a report."""
+    verdicts = _tally(results)
+    return {
+        "total": len(results),
+        "correct": verdicts["correct"],
+        "partial": verdicts["partially_correct"],
+        "incorrect": verdicts["incorrect"],
+    }
+
+def _report_path(output_dir: str, prefix: str, extension: str, now: datetime) -> str:
+    """Ensure output_dir exists and return a timestamped report path inside it."""
+    ensure_output_directory(output_dir)
+    timestamp = now.strftime(_FILENAME_TS_FORMAT)
+    return os.path.join(output_dir, f"{prefix}_{timestamp}.{extension}")
+
+def save_json_report(results: List[Dict], output_dir: str = "output", compress: bool = False) -> str:
     """
     Save analysis results as JSON file.
     
     Args:
         results: List of analysis results
         output_dir: Directory to save the report
+        compress: Write gzip-compressed JSON to a .json.gz file instead
     
     Returns:
         Path to saved JSON file
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"analysis_results_{timestamp}.json"
-        filepath = os.path.join(output_dir, filename)
+        now = datetime.now()
+        filepath = _report_path(output_dir, "analysis_results", "json", now)
+        summary = _summarize(results)
         
         # Create structured output
         output = {
             "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "total_articles": len(results),
-                "correct_analyses": sum(1 for r in results if r.get("validation", {}).get("verdict") == "correct"),
-                "partially_correct": sum(1 for r in results if r.get("validation", {}).get("verdict") == "partially_correct"),
-                "incorrect_analyses": sum(1 for r in results if r.get("validation", {}).get("verdict") == "incorrect"),
+                "generated_at": now.isoformat(),
+                "total_articles": summary["total"],
+                "correct_analyses": summary["correct"],
+                "partially_correct": summary["partial"],
+                "incorrect_analyses": summary["incorrect"],
             },
             "results": results
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        if compress:
+            # Level 1 costs little CPU and still shrinks the output several times over
+            filepath += ".gz"
+            with gzip.open(filepath, 'wb', compresslevel=1) as f:
+                f.write(dumps_json(output, pretty=True))
+        else:
+            # orjson (when installed) encodes to bytes in one call; written with a single write
+            write_json(filepath, output, pretty=True)
         
         return filepath
         
@@ -56,26 +112,26 @@ def save_markdown_report(results: List[Dict], output_dir: str = "output") -> str
         Path to saved Markdown file
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"analysis_report_{timestamp}.md"
-        filepath = os.path.join(output_dir, filename)
+        now = datetime.now()
+        filepath = _report_path(output_dir, "analysis_report", "md", now)
         
         # Calculate statistics
-        total = len(results)
-        correct = sum(1 for r in results if r.get("validation", {}).get("verdict") == "correct")
-        partial = sum(1 for r in results if r.get("validation", {}).get("verdict") == "partially_correct")
-        incorrect = sum(1 for r in results if r.get("validation", {}).get("verdict") == "incorrect")
+        summary = _summarize(results)
+        total = summary["total"]
+        correct = summary["correct"]
+        partial = summary["partial"]
+        incorrect = summary["incorrect"]
         
         # Avoid division by zero
         if total == 0:
             total = 1
         
-        # Build markdown content
-        md_content = f"""# News Analysis Report
+        # Sections are encoded to UTF-8 once and written in ~1 MiB chunks, so only
+        # one chunk of the report is held in memory
+        with open(filepath, 'wb') as f:
+            buffer = bytearray(f"""# News Analysis Report
 
-**Generated:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+**Generated:** {now.strftime("%Y-%m-%d %H:%M:%S")}
 
 ---
 
@@ -90,59 +146,50 @@ def save_markdown_report(results: List[Dict], output_dir: str = "output") -> str
 
 ## Detailed Results
 
-"""
-        
-        for i, result in enumerate(results, 1):
-            article = result.get("article", {})
-            analysis = result.get("analysis", "No analysis available")
-            validation = result.get("validation", {})
-            
-            verdict = validation.get("verdict", "unknown")
-            confidence = validation.get("confidence", 0)
-            issues = validation.get("issues", [])
-            strengths = validation.get("strengths", [])
-            
-            # Verdict emoji
-            verdict_emoji = {
-                "correct": "✅",
-                "partially_correct": "⚠️",
-                "incorrect": "❌"
-            }.get(verdict, "❓")
-            
-            md_content += f"""### {i}. {article.get('title', 'Untitled')}
-
-**Validation:** {verdict_emoji} {verdict.upper()} (Confidence: {confidence:.2f})
-
-**Source:** [{article.get('source', {}).get('name', 'Unknown')}]({article.get('url', '#')})
-
-**Published:** {article.get('publishedAt', 'Unknown')}
-
-#### Analysis
-{analysis}
-
-#### Validation Results
-
-"""
-            
-            if strengths:
-                md_content += "**Strengths:**\n"
-                for strength in strengths:
-                    md_content += f"- {strength}\n"
-                md_content += "\n"
+""".encode('utf-8'))
             
-            if issues:
-                md_content += "**Issues Found:**\n"
-                for issue in issues:
-                    md_content += f"- {issue}\n"
-                md_content += "\n"
+            for i, result in enumerate(results, 1):
+                article = result.get("article", {})
+                analysis = result.get("analysis", "No analysis available")
+                validation = result.get("validation") or {}
+                
+                verdict = validation.get("verdict", "unknown")
+                confidence = validation.get("confidence", 0)
+                issues = validation.get("issues", [])
+                strengths = validation.get("strengths", [])
+                
+                header = _ARTICLE_TMPL.format_map({
+                    "i": i,
+                    "title": article.get('title', 'Untitled'),
+                    "emoji": _VERDICT_EMOJI.get(verdict, "❓"),
+                    "verdict_upper": verdict.upper(),
+                    "confidence": confidence,
+                    "source_name": article.get('source', {}).get('name', 'Unknown'),
+                    "url": article.get('url', '#'),
+                    "published": article.get('publishedAt', 'Unknown'),
+                    "analysis": analysis,
+                })
+                
+                # Every section has the same five pieces (empty when absent), so the
+                # join takes a fixed-size tuple rather than a list grown by appends
+                strengths_block = ""
+                if strengths:
+                    strengths_block = "**Strengths:**\n" + "".join(f"- {strength}\n" for strength in strengths) + "\n"
+                
+                issues_block = ""
+                if issues:
+                    issues_block = "**Issues Found:**\n" + "".join(f"- {issue}\n" for issue in issues) + "\n"
+                
+                assessment = validation.get("overall_assessment")
+                assessment_line = f"**Overall Assessment:** {assessment}\n" if assessment else ""
+                
+                buffer += "".join((header, strengths_block, issues_block, assessment_line, "\n---\n\n")).encode('utf-8')
+                
+                if len(buffer) >= _FLUSH_BYTES:
+                    f.write(buffer)
+                    buffer.clear()
             
-            if validation.get("overall_assessment"):
-                md_content += f"**Overall Assessment:** {validation.get('overall_assessment')}\n"
-            
-            md_content += "\n---\n\n"
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+            f.write(buffer)
         
         return filepath
         
@@ -1,21 +1,77 @@
+from collections import deque
 from datetime import datetime
+import json
 import os
+import re
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ANALYSIS_FIELD_RE = re.compile(
+    r"^[ \t*#\d.]*(GIST|SENTIMENT|TONE)[ \t*]*:[ \t*]*(.*?)[ \t*]*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Markdown code fence (``` or ~~~, optionally tagged json) wrapping an LLM response
+_FENCE_RE = re.compile(r"^\s*(?:```|~~~)(?:json)?\s*|\s*(?:```|~~~)\s*$", re.IGNORECASE)
 
 def get_timestamp() -> str:
     """Return current timestamp in ISO format."""
     return datetime.now().isoformat()
 
+# Directories already created this run, so repeat calls skip the syscalls
+_ensured_dirs = set()
+
 def ensure_output_directory(output_dir: str = "output") -> None:
     """Ensure output directory exists."""
+    if output_dir in _ensured_dirs:
+        return
     os.makedirs(output_dir, exist_ok=True)
+    _ensured_dirs.add(output_dir)
+
+def strip_code_fences(text: str) -> str:
+    """Remove a markdown code fence wrapped around text."""
+    return _FENCE_RE.sub("", text).strip()
+
+def dumps_json(data, pretty: bool = True) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def loads_json(text):
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def write_json(filepath: str, data, pretty: bool = True) -> None:
+    """
+    Serialize data to UTF-8 JSON and write it with a single write call.
+    
+    Args:
+        filepath: Destination path
+        data: JSON-serializable object
+        pretty: Indent the output for human readers
+    """
+    payload = dumps_json(data, pretty=pretty)
+    with open(filepath, 'wb') as f:
+        f.write(payload)
 
 def truncate_text(text: str, max_length: int = 500) -> str:
     """Truncate text to max_length characters."""
     if not text:
         return ""
-    if len(text) <= max_length:
-        return text
-    return text[:max_length] + "..."
+    return text if len(text) <= max_length else text[:max_length] + "..."
 
 def validate_article(article: dict) -> bool:
     """
@@ -28,8 +84,46 @@ def validate_article(article: dict) -> bool:
         True if valid, False otherwise
     """
     # Only require title and content (description is optional)
-    required_fields = ["title", "content"]
-    return all(article.get(field) for field in required_fields)
+    return bool(article.get("title")) and bool(article.get("content"))
+
+def validate_articles(articles: list) -> list:
+    """
+    Validate a batch of articles in one pass.
+    
+    Args:
+        articles: List of article dictionaries
+    
+    Returns:
+        List of booleans, one per article, as validate_article would return
+    """
+    return [bool(a.get("title")) and bool(a.get("content")) for a in articles]
+
+def parse_analysis(text: str) -> dict:
+    """
+    Extract the GIST, SENTIMENT and TONE fields from an LLM analysis.
+    
+    Args:
+        text: Analysis text using the "HEADING: value" format
+    
+    Returns:
+        dict with gist, sentiment and tone (empty string when missing)
+    """
+    parsed = {"gist": "", "sentiment": "", "tone": ""}
+    if not text:
+        return parsed
+    
+    for match in _ANALYSIS_FIELD_RE.finditer(text):
+        field = match.group(1).lower()
+        if parsed[field]:
+            continue
+        # The pattern leaves "\r" (CRLF text) and other Unicode whitespace in place
+        value = match.group(2).strip().strip("*").strip()
+        # Heading on its own line: the value continues on the next line
+        if not value:
+            value = text[match.end() + 1:].split("\n", 1)[0].strip()
+        parsed[field] = value
+    
+    return parsed
 
 def format_article_summary(article: dict) -> str:
     """
@@ -47,14 +141,66 @@ def format_article_summary(article: dict) -> str:
     
     return f"{title} | {source} | {published}"
 
+# Minimum seconds between progress redraws (~30 per second); the final update always prints
+_PROGRESS_INTERVAL = 0.033
+_last_progress_print = 0.0
+
+_BAR_LENGTH = 40
+_FULL_BAR = "█" * _BAR_LENGTH
+
 def print_progress(current: int, total: int, message: str = "") -> None:
     """Print progress indicator."""
+    global _last_progress_print
+    now = time.monotonic()
+    if current != total and now - _last_progress_print < _PROGRESS_INTERVAL:
+        return
+    _last_progress_print = now
+    
     percentage = (current / total * 100) if total > 0 else 0
-    bar_length = 40
-    filled = int(bar_length * current / total) if total > 0 else 0
-    bar = "█" * filled + "-" * (bar_length - filled)
+    filled = int(_BAR_LENGTH * current / total) if total > 0 else 0
+    bar = _FULL_BAR[:filled].ljust(_BAR_LENGTH, "-")
     
     print(f"\r[{bar}] {percentage:.1f}% ({current}/{total}) {message}", end="", flush=True)
     
     if current == total:
         print()  # New line when complete
+
+class RateLimiter:
+    """
+    Thread-safe limiter allowing at most max_calls per period seconds.
+    
+    Args:
+        max_calls: Number of calls permitted within one window
+        period: Window length in seconds
+    """
+    
+    def __init__(self, max_calls: int, period: float = 60.0):
+        self.max_calls = max(1, max_calls)
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+    
+    def close(self) -> None:
+        """Wake any waiting callers and refuse further slots."""
+        self._closed.set()
+    
+    def acquire(self) -> None:
+        """
+        Block until a call slot is available in the current window.
+        
+        Raises:
+            RuntimeError: If the limiter is closed before a slot is granted
+        """
+        while True:
+            if self._closed.is_set():
+                raise RuntimeError("Rate limiter closed")
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            self._closed.wait(wait)
@@ -4,16 +4,25 @@ Unit tests for News Analyzer components
 """
 
 import unittest
+import json
 import sys
 import os
+import tempfile
+import threading
+import time
+import gzip
+import io
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest import mock
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# pytest adds src to the path via conftest.py; do it here when run as a script
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.utils import validate_article, truncate_text, format_article_summary
-from src.news_fetcher import NewsFetcherError
-from src.llm_analyzer import LLMAnalysisError
-from src.llm_validator import LLMValidationError
+from src import utils
+from src.utils import validate_article, validate_articles, truncate_text, format_article_summary, parse_analysis, strip_code_fences, RateLimiter
+from src import cache as llm_cache
 
 
 class TestArticleValidation(unittest.TestCase):
@@ -67,6 +76,17 @@ class TestArticleValidation(unittest.TestCase):
             "content": None
         }
         self.assertFalse(validate_article(article))
+    
+    def test_validate_articles_matches_single_validation(self):
+        """Test that bulk validation agrees with validate_article per article"""
+        articles = [
+            {"title": "Test Article", "content": "This is test content."},
+            {"title": "", "content": "This is test content."},
+            {"title": "Test Article", "content": None},
+            {"description": "Test description"}
+        ]
+        self.assertEqual(validate_articles(articles), [True, False, False, False])
+        self.assertEqual(validate_articles(articles), [validate_article(a) for a in articles])
 
 
 class TestUtilityFunctions(unittest.TestCase):
@@ -123,27 +143,478 @@ class TestUtilityFunctions(unittest.TestCase):
         self.assertIn("Test Article", result)
         self.assertIn("Unknown", result)
 
+    
+    def test_parse_analysis_fields(self):
+        """Test that GIST, SENTIMENT and TONE are extracted"""
+        analysis = "GIST: Test summary\n\nSENTIMENT: Neutral\n\n**Tone:** Analytical"
+        result = parse_analysis(analysis)
+        self.assertEqual(result, {"gist": "Test summary", "sentiment": "Neutral", "tone": "Analytical"})
+    
+    def test_parse_analysis_value_on_next_line(self):
+        """Test that a heading with no inline value reads the next line"""
+        result = parse_analysis("SENTIMENT:\nPositive")
+        self.assertEqual(result["sentiment"], "Positive")
+        self.assertEqual(result["gist"], "")
+    
+    def test_parse_analysis_crlf(self):
+        """Test that CRLF line endings do not leak into values or hide the next line"""
+        result = parse_analysis("GIST:\r\nSomething happened\r\nSENTIMENT: Negative\r\n**TONE:** Analytical **\r\n")
+        self.assertEqual(result, {"gist": "Something happened", "sentiment": "Negative", "tone": "Analytical"})
+    
+    def test_strip_code_fences(self):
+        """Test that markdown fences around JSON are removed"""
+        self.assertEqual(strip_code_fences('```json\n{"verdict": "correct"}\n```'), '{"verdict": "correct"}')
+        self.assertEqual(strip_code_fences('~~~\n[]\n~~~'), '[]')
+        self.assertEqual(strip_code_fences(' {"a": 1} '), '{"a": 1}')
+
+class TestProgress(unittest.TestCase):
+    """Test the throttled progress bar"""
+    
+    def test_updates_are_throttled_but_completion_prints(self):
+        """Test that updates within 33 ms are skipped and the final update always prints"""
+        clock = [100.0, 100.01, 100.05, 100.06]
+        output = io.StringIO()
+        with mock.patch.object(utils, "_last_progress_print", 0.0), \
+                mock.patch.object(utils.time, "monotonic", side_effect=clock), \
+                redirect_stdout(output):
+            utils.print_progress(1, 4, "first")
+            utils.print_progress(2, 4, "skipped")
+            utils.print_progress(3, 4, "third")
+            utils.print_progress(4, 4, "done")
+        
+        text = output.getvalue()
+        self.assertIn("(1/4) first", text)
+        self.assertNotIn("skipped", text)
+        self.assertIn("(3/4) third", text)
+        self.assertTrue(text.endswith("100.0% (4/4) done\n"))
+    
+    def test_completion_prints_inside_throttle_window(self):
+        """Test that current == total is printed even right after another update"""
+        output = io.StringIO()
+        with mock.patch.object(utils, "_last_progress_print", 0.0), \
+                mock.patch.object(utils.time, "monotonic", side_effect=[100.0, 100.001]), \
+                redirect_stdout(output):
+            utils.print_progress(1, 2, "first")
+            utils.print_progress(2, 2, "done")
+        self.assertTrue(output.getvalue().endswith("(2/2) done\n"))
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test the rate limiter used for LLM calls"""
+    
+    def test_calls_within_limit_do_not_block(self):
+        """Test that calls up to the limit return immediately"""
+        limiter = RateLimiter(3, period=5.0)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 1.0)
+    
+    def test_call_over_limit_waits_for_window(self):
+        """Test that exceeding the limit blocks until the window frees up"""
+        limiter = RateLimiter(2, period=0.2)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+    
+    def test_close_wakes_waiting_callers(self):
+        """Test that close() makes a blocked acquire raise instead of waiting out the window"""
+        limiter = RateLimiter(1, period=60.0)
+        limiter.acquire()
+        errors = []
+        
+        def wait_for_slot():
+            try:
+                limiter.acquire()
+            except RuntimeError as e:
+                errors.append(e)
+        
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        time.sleep(0.05)
+        limiter.close()
+        waiter.join(timeout=1.0)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+class TestLLMCache(unittest.TestCase):
+    """Test on-disk memoization of LLM calls"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_path = llm_cache.CACHE_PATH
+        llm_cache.CACHE_PATH = os.path.join(self.tmpdir.name, "llm_cache")
+    
+    def tearDown(self):
+        llm_cache.CACHE_PATH = self.original_path
+        self.tmpdir.cleanup()
+    
+    def test_stored_results_are_returned(self):
+        """Test that stored results come back by key and unknown keys miss"""
+        llm_cache.store_many({"a": {"analysis": "Mock analysis"}, "b": {"analysis": "Other"}})
+        self.assertEqual(
+            llm_cache.get_many(["b", "missing", "a"]),
+            [{"analysis": "Other"}, None, {"analysis": "Mock analysis"}]
+        )
+    
+    def test_extra_values_are_part_of_the_key(self):
+        """Test that a different model or prompt template produces a different key"""
+        article = {"url": "https://example.com/a", "content": "Content"}
+        key = llm_cache.make_key("test", article, "model-a", "tmpl")
+        self.assertEqual(key, llm_cache.make_key("test", article, "model-a", "tmpl"))
+        self.assertNotEqual(key, llm_cache.make_key("test", article, "model-b", "tmpl"))
+        self.assertNotEqual(key, llm_cache.make_key("test", article, "model-a", "tmpl v2"))
+    
+    def test_disabled_cache_neither_reads_nor_writes(self):
+        """Test that LLM_CACHE_DISABLED bypasses reads and writes"""
+        with mock.patch.object(llm_cache, "ENABLED", False):
+            llm_cache.store_many({"a": {"analysis": "Mock analysis"}})
+            self.assertEqual(llm_cache.get_many(["a"]), [None])
+        self.assertEqual(llm_cache.get_many(["a"]), [None])
+    
+    def test_changed_content_misses_cache(self):
+        """Test that different content produces a different key"""
+        article = {"url": "https://example.com/a", "content": "Content"}
+        changed = {"url": "https://example.com/a", "content": "Updated content"}
+        self.assertNotEqual(
+            llm_cache.make_key("test", article),
+            llm_cache.make_key("test", changed)
+        )
+
+
+def _combined_item(index, gist):
+    """Build one batch result object as the model would return it"""
+    return {
+        "index": index,
+        "analysis": {"gist": gist, "sentiment": "Neutral", "tone": "analytical",
+                     "key_entities": [], "why_this_matters": "Test"},
+        "validation": {"verdict": "correct", "confidence": 0.9, "issues": [],
+                       "strengths": [], "overall_assessment": "Test"}
+    }
+
+
+class TestCombinedBatch(unittest.TestCase):
+    """Test analyze_and_validate_batch with a stubbed Gemini call"""
+    
+    def setUp(self):
+        from src import llm_combined
+        self.llm_combined = llm_combined
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        cache_path = mock.patch.object(llm_cache, "CACHE_PATH", os.path.join(self.tmpdir.name, "llm_cache"))
+        cache_path.start()
+        self.addCleanup(cache_path.stop)
+        self.articles = [
+            {"title": f"Article {n}", "content": f"Content {n}", "url": f"https://example.com/{n}"}
+            for n in range(3)
+        ]
+    
+    def _run(self, response):
+        with mock.patch.object(self.llm_combined, "_generate_json", return_value=response) as generate:
+            results = self.llm_combined.analyze_and_validate_batch(self.articles)
+        return results, generate
+    
+    def test_results_are_matched_by_index(self):
+        """Test that reordered results are attached to the article they describe"""
+        response = [_combined_item(3, "gist 2"), _combined_item(1, "gist 0"), _combined_item(2, "gist 1")]
+        results, _ = self._run(response)
+        for n, result in enumerate(results):
+            self.assertEqual(result["title"], f"Article {n}")
+            self.assertIn(f"GIST: gist {n}", result["analysis"])
+    
+    def test_only_uncached_articles_are_sent(self):
+        """Test that cached articles are served from the cache and left out of the prompt"""
+        self._run([_combined_item(1, "gist 0"), _combined_item(2, "gist 1"), _combined_item(3, "gist 2")])
+        self.articles[1] = {"title": "Article new", "content": "New content", "url": "https://example.com/new"}
+        
+        results, generate = self._run([_combined_item(1, "gist new")])
+        prompt = generate.call_args[0][0]
+        self.assertIn("Title: Article new", prompt)
+        self.assertNotIn("Title: Article 0", prompt)
+        self.assertNotIn("Title: Article 2", prompt)
+        self.assertEqual([r["title"] for r in results], ["Article 0", "Article new", "Article 2"])
+        self.assertIn("GIST: gist 2", results[2]["analysis"])
+    
+    def test_cache_key_depends_on_model(self):
+        """Test that switching GEMINI_MODEL does not replay results from the old model"""
+        key = self.llm_combined._cache_key(self.articles[0])
+        with mock.patch.object(self.llm_combined, "MODEL", "models/other-model"):
+            self.assertNotEqual(self.llm_combined._cache_key(self.articles[0]), key)
+    
+    def test_malformed_responses_raise_and_are_not_cached(self):
+        """Test that bad arrays raise LLMCombinedError and nothing is cached"""
+        bad_responses = [
+            {"index": 1},
+            [_combined_item(1, "gist 0"), _combined_item(2, "gist 1")],
+            [_combined_item(1, "gist 0"), _combined_item(1, "gist 1"), _combined_item(2, "gist 2")],
+            [_combined_item(1, "gist 0"), _combined_item(2, "gist 1"), _combined_item(4, "gist 2")],
+            [_combined_item(1, "gist 0"), _combined_item(2, "gist 1"), {"analysis": {}, "validation": {}}],
+        ]
+        for response in bad_responses:
+            with self.assertRaises(self.llm_combined.LLMCombinedError):
+                self._run(response)
+        key = self.llm_combined._cache_key(self.articles[0])
+        self.assertEqual(llm_cache.get_many([key]), [None])
+
+
+class _FlakyStream:
+    """Stand-in for response.raw that serves a prefix of the body, then fails"""
+    
+    def __init__(self, body, error=None):
+        self.body = body
+        self.error = error
+        self.decode_content = False
+    
+    def read(self, size=-1):
+        if size == 0:
+            return b""
+        chunk, self.body = self.body, b""
+        if not chunk and self.error is not None:
+            raise self.error
+        return chunk
+
+
+class TestNewsFetcher(unittest.TestCase):
+    """Test fetch_news with a mocked HTTP session"""
+    
+    ARTICLE = {
+        "title": "Test Article",
+        "content": "This is test content that is long enough to pass the filter.",
+        "source": {"name": "Test Source"},
+        "url": "https://example.com/a",
+        "publishedAt": "2026-01-17T10:00:00Z"
+    }
+    
+    def setUp(self):
+        from src import news_fetcher
+        self.news_fetcher = news_fetcher
+        env = mock.patch.dict(os.environ, {"NEWSAPI_API_KEY": "test-key"})
+        env.start()
+        self.addCleanup(env.stop)
+    
+    def _fetch(self, response, use_ijson=True):
+        ijson_module = self.news_fetcher.ijson if use_ijson else None
+        with mock.patch.object(self.news_fetcher, "_SESSION") as session, \
+                mock.patch.object(self.news_fetcher, "ijson", ijson_module):
+            session.get.return_value = response
+            return self.news_fetcher.fetch_news()
+    
+    def test_streamed_articles_are_normalized(self):
+        """Test that the ijson path parses articles from the raw stream"""
+        if self.news_fetcher.ijson is None:
+            self.skipTest("ijson not installed")
+        response = mock.MagicMock()
+        response.raw = _FlakyStream(json.dumps({"articles": [self.ARTICLE]}).encode("utf-8"))
+        articles = self._fetch(response)
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(articles[0]["source"], "Test Source")
+    
+    def test_stream_failures_raise_fetcher_error(self):
+        """Test that a dropped connection or truncated body becomes NewsFetcherError"""
+        if self.news_fetcher.ijson is None:
+            self.skipTest("ijson not installed")
+        import urllib3
+        body = b'{"articles": [{"title": "Test Article", "content": "Trunc'
+        for error in (urllib3.exceptions.ProtocolError("Connection broken"), None):
+            response = mock.MagicMock()
+            response.raw = _FlakyStream(body, error)
+            with self.assertRaises(self.news_fetcher.NewsFetcherError):
+                self._fetch(response)
+    
+    def test_json_fallback(self):
+        """Test the response.json() path used when ijson is unavailable"""
+        response = mock.MagicMock()
+        response.json.return_value = {"articles": [self.ARTICLE]}
+        self.assertEqual(len(self._fetch(response, use_ijson=False)), 1)
+        
+        response.json.side_effect = ValueError("Expecting value")
+        with self.assertRaises(self.news_fetcher.NewsFetcherError):
+            self._fetch(response, use_ijson=False)
+
+
+class TestReportWriter(unittest.TestCase):
+    """Test the JSON and Markdown report writers"""
+    
+    RESULTS = [
+        {
+            "article": {"title": "Budget passes – “historic” vote", "source": {"name": "The Hindu"},
+                        "url": "https://example.com/a", "publishedAt": "2026-01-17T10:00:00Z"},
+            "analysis": "GIST: Budget passed\nSENTIMENT: Positive",
+            "validation": {"verdict": "correct", "confidence": 0.9, "issues": [],
+                           "strengths": ["Accurate gist", "Clear tone"], "overall_assessment": "Solid analysis"}
+        },
+        {
+            "article": {"title": "Opposition walkout"},
+            "analysis": "GIST: Walkout",
+            "validation": {"verdict": "partially_correct", "confidence": 0.5,
+                           "issues": ["Tone overstated"], "strengths": []}
+        },
+        {"article": {}, "validation": {}}
+    ]
+    
+    # Output of the original f-string implementation; rewrites must keep it byte-identical
+    EXPECTED_MARKDOWN = """# News Analysis Report
+
+**Generated:** 2026-01-17 10:30:00
+
+---
+
+## Summary Statistics
+
+- **Total Articles Analyzed:** 3
+- **Correct Analyses:** 1 (33.3%)
+- **Partially Correct:** 1 (33.3%)
+- **Incorrect Analyses:** 0 (0.0%)
+
+---
+
+## Detailed Results
+
+### 1. Budget passes – “historic” vote
+
+**Validation:** ✅ CORRECT (Confidence: 0.90)
+
+**Source:** [The Hindu](https://example.com/a)
+
+**Published:** 2026-01-17T10:00:00Z
+
+#### Analysis
+GIST: Budget passed
+SENTIMENT: Positive
+
+#### Validation Results
+
+**Strengths:**
+- Accurate gist
+- Clear tone
+
+**Overall Assessment:** Solid analysis
+
+---
+
+### 2. Opposition walkout
+
+**Validation:** ⚠️ PARTIALLY_CORRECT (Confidence: 0.50)
+
+**Source:** [Unknown](#)
+
+**Published:** Unknown
+
+#### Analysis
+GIST: Walkout
+
+#### Validation Results
+
+**Issues Found:**
+- Tone overstated
+
+
+---
+
+### 3. Untitled
+
+**Validation:** ❓ UNKNOWN (Confidence: 0.00)
+
+**Source:** [Unknown](#)
+
+**Published:** Unknown
+
+#### Analysis
+No analysis available
+
+#### Validation Results
+
+
+---
+
+"""
+    
+    def setUp(self):
+        from src import report_writer
+        self.report_writer = report_writer
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        clock = mock.patch.object(report_writer, "datetime")
+        clock.start().now.return_value = datetime(2026, 1, 17, 10, 30, 0)
+        self.addCleanup(clock.stop)
+    
+    def test_markdown_report_matches_golden_output(self):
+        """Test that the Markdown report layout is unchanged"""
+        path = self.report_writer.save_markdown_report(self.RESULTS, self.tmpdir.name)
+        self.assertTrue(path.endswith("analysis_report_20260117_103000.md"))
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), self.EXPECTED_MARKDOWN)
+    
+    def test_reports_accept_failed_results(self):
+        """Test that results whose validation is None (failed batches) do not break either report"""
+        failed = [{"article": {"title": "Failed"}, "analysis": None, "validation": None, "status": "analysis_failed"}]
+        path = self.report_writer.save_markdown_report(failed, self.tmpdir.name)
+        with open(path, encoding="utf-8") as f:
+            self.assertIn("### 1. Failed\n\n**Validation:** ❓ UNKNOWN", f.read())
+        self.report_writer.save_json_report(failed, self.tmpdir.name)
+    
+    def test_compressed_json_report_round_trip(self):
+        """Test that compress=True writes gzip JSON with the same metadata"""
+        path = self.report_writer.save_json_report(self.RESULTS, self.tmpdir.name, compress=True)
+        self.assertTrue(path.endswith(".json.gz"))
+        with gzip.open(path) as f:
+            output = json.loads(f.read())
+        self.assertEqual(output["metadata"], {
+            "generated_at": "2026-01-17T10:30:00",
+            "total_articles": 3,
+            "correct_analyses": 1,
+            "partially_correct": 1,
+            "incorrect_analyses": 0
+        })
+        self.assertEqual(output["results"], self.RESULTS)
+
+
+class TestFileManager(unittest.TestCase):
+    """Test the pipeline output files"""
+    
+    def test_final_report_ignores_blank_sentiments(self):
+        """Test that whitespace-only sentiments are skipped instead of crashing the report"""
+        from src.file_manager import save_final_report
+        
+        results = [
+            {"status": "validated", "article": {"title": f"Article {n}"}, "analysis": "Mock analysis",
+             "parsed": {"gist": "Test", "sentiment": sentiment, "tone": "Analytical"},
+             "validation": {"verdict": "correct"}}
+            for n, sentiment in enumerate(["Positive.", "\r", "\xa0", "negative overall"])
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = save_final_report(results, tmpdir)
+            with open(path, encoding="utf-8") as f:
+                report = f.read()
+        self.assertIn("**Positive:** 1 articles", report)
+        self.assertIn("**Negative:** 1 articles", report)
+        self.assertIn("**Neutral:** 0 articles", report)
+        self.assertIn('### Article 4: "Article 3"', report)
+
 
 class TestErrorHandling(unittest.TestCase):
     """Test custom exception classes"""
     
     def test_news_fetcher_error(self):
         """Test NewsFetcherError can be raised and caught"""
+        from src.news_fetcher import NewsFetcherError
+        
         with self.assertRaises(NewsFetcherError):
             raise NewsFetcherError("Test error message")
     
-    def test_llm_analysis_error(self):
-        """Test LLMAnalysisError can be raised and caught"""
-        with self.assertRaises(LLMAnalysisError):
-            raise LLMAnalysisError("Test analysis error")
-    
-    def test_llm_validation_error(self):
-        """Test LLMValidationError can be raised and caught"""
-        with self.assertRaises(LLMValidationError):
-            raise LLMValidationError("Test validation error")
+    def test_llm_combined_error(self):
+        """Test LLMCombinedError can be raised and caught"""
+        from src.llm_combined import LLMCombinedError
+        
+        with self.assertRaises(LLMCombinedError):
+            raise LLMCombinedError("Test analysis error")
     
     def test_error_messages(self):
         """Test that error messages are preserved"""
+        from src.news_fetcher import NewsFetcherError
+        
         error_msg = "Specific error details"
         try:
             raise NewsFetcherError(error_msg)
@@ -233,16 +704,9 @@ def run_tests():
     print("=" * 70)
     print()
     
-    # Create test suite
+    # Collect every TestCase in this module
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Add all test classes
-    suite.addTests(loader.loadTestsFromTestCase(TestArticleValidation))
-    suite.addTests(loader.loadTestsFromTestCase(TestUtilityFunctions))
-    suite.addTests(loader.loadTestsFromTestCase(TestErrorHandling))
-    suite.addTests(loader.loadTestsFromTestCase(TestDataStructures))
-    suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
     
     # Run tests with detailed output
     runner = unittest.TextTestRunner(verbosity=2)